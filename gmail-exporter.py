@@ -5,21 +5,97 @@ Checks gmail labels for unread messages and exposes the counts via prometheus.
 
 import os
 import sys
-from time import sleep
+from time import sleep, time
 import logging
-from functools import lru_cache
+import threading
+from collections import Counter
+from functools import partial
+from dataclasses import dataclass
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
 import httplib2
 import configargparse
+from cachetools import TTLCache
 
-from prometheus_client import start_http_server, Gauge
+from prometheus_client import start_http_server, Gauge, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
 
 from googleapiclient import discovery
+from googleapiclient.model import JsonModel
+from googleapiclient.http import build_http
+from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 
-GMAIL_CLIENT = None
-THREAD_SENDER_CACHE = dict()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
+CREDENTIALS = None
+
+# httplib2, which the API client uses, is not thread safe, so every thread
+# gets its own client.
+THREAD_LOCAL = threading.local()
+EXECUTOR = None
+
+# The gmail API accepts at most 100 calls in a single batch request.
+BATCH_SIZE = 100
+
+THREAD_LIST_FIELDS = 'nextPageToken,threads/id'
+
+# Thread id -> sender, bounded so that threads which are long gone do not stay in
+# memory forever. Created in main() once the size and TTL options are known.
+THREAD_SENDER_CACHE = None
+THREAD_SENDER_LOCK = threading.Lock()
+
+LAST_HISTORY_ID = None
+
+# Set by GmailCollector when a scrape finds the metrics stale, the update worker waits on it.
+UPDATE_REQUESTED = threading.Event()
+LAST_UPDATE = {'time': 0}
+
+# Probes can check this on /metrics, it is 1 once a full update has completed.
+READY_GAUGE = Gauge('gmail_exporter_ready', 'Whether the gmail metrics have been updated at least once')
+
+MIN_BACKOFF_SECONDS = 10
+MAX_BACKOFF_SECONDS = 600
+
+# Label names do not change between updates, only the counters do.
+LABEL_NAME_CACHE = dict()
+
+def use_orjson_for_responses():
+    """
+    Parses API responses with orjson when it is installed, which is a lot faster
+    than json on the large thread listings. Without orjson nothing changes.
+    """
+
+    if orjson is None:
+        return
+
+    json_deserialize = JsonModel.deserialize
+
+    def orjson_deserialize(self, content):
+        # JsonModel has no public accessor for this, and responses wrapped in "data" must
+        # still be unwrapped by the stock deserialize().
+        if self._data_wrapper:  # pylint: disable=protected-access
+            return json_deserialize(self, content)
+
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return json_deserialize(self, content)
+
+    JsonModel.deserialize = orjson_deserialize
 
 def get_homedir_filepath(filename):
     config_dir = os.path.join(os.path.expanduser("~"), ".prometheus-gmail-exporter")
@@ -29,6 +105,60 @@ def get_homedir_filepath(filename):
 
     return os.path.join(config_dir, filename)
 
+def file_has_content(path):
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
+def wait_for_file(path, poll_seconds = 10):
+    """
+    Blocks until path exists and has content. With watchdog installed this
+    returns once the writer closes the file (or moves it into place), otherwise
+    the path is checked every poll_seconds.
+    """
+
+    if file_has_content(path):
+        return
+
+    path = os.path.abspath(path)
+    written = threading.Event()
+    observer = None
+
+    if Observer is not None:
+        class WrittenHandler(FileSystemEventHandler):
+            """
+            Wakes wait_for_file when path is closed after writing or moved into place.
+            """
+
+            def on_closed(self, event):
+                if os.path.abspath(event.src_path) == path:
+                    written.set()
+
+            def on_moved(self, event):
+                if os.path.abspath(event.dest_path) == path:
+                    written.set()
+
+        try:
+            observer = Observer()
+            observer.schedule(WrittenHandler(), os.path.dirname(path))
+            observer.start()
+        except Exception as e:
+            logging.warning("Cannot watch for %s, polling instead: %s", path, e)
+            observer = None
+
+    try:
+        # The event is cleared before every check, so a file that is created and
+        # removed again does not keep waking this up. The timeout is the polling
+        # fallback, for when there is no observer or it does not report closes.
+        while True:
+            written.wait(poll_seconds)
+            written.clear()
+
+            if file_has_content(path):
+                return
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
 def get_credentials():
     """Gets valid user credentials from storage.
 
@@ -38,9 +168,9 @@ def get_credentials():
 
     SCOPES = 'https://www.googleapis.com/auth/gmail.readonly '
 
-    while not os.path.exists(args.clientSecretFile):
+    if not os.path.exists(args.clientSecretFile):
         logging.fatal("Client secrets file does not exist: %s . You probably need to download this from the Google API console.", args.clientSecretFile)
-        sleep(10)
+        wait_for_file(args.clientSecretFile)
 
     credentials = None
 
@@ -74,11 +204,12 @@ def run_flow(flow, store):
         logging.info("Waiting for code at %s", get_homedir_filepath('auth_code'))
 
         while True:
+            wait_for_file(get_homedir_filepath('auth_code'))
+
             try:
-                if os.path.exists(get_homedir_filepath('auth_code')):
-                    with open(get_homedir_filepath('auth_code'), 'r') as auth_code_file:
-                        code = auth_code_file.read()
-                        break
+                with open(get_homedir_filepath('auth_code'), 'r') as auth_code_file:
+                    code = auth_code_file.read()
+                    break
 
             except Exception as e:
                 logging.critical(e)
@@ -93,21 +224,35 @@ def run_flow(flow, store):
 
     return credential
 
-@lru_cache(maxsize=1)
+LABELS_CACHE = {'labels': None, 'fetched': 0}
+
 def get_labels():
     """
-    Note that this func is cached (lru_cache) and will only run once.
+    Note that this func is cached, the labels are only fetched again after
+    labelsRefreshSeconds, so new labels are picked up without a restart.
     """
 
+    if LABELS_CACHE['labels'] is not None and time() - LABELS_CACHE['fetched'] < args.labelsRefreshSeconds:
+        return LABELS_CACHE['labels']
+
     logging.info("Getting metadata about labels")
 
     labels = []
 
     if len(args.labels) == 0:
         logging.warning("No labels specified, assuming all labels. If you have a lot of labels in your inbox you could hit API limits quickly.")
-        results = GMAIL_CLIENT.users().labels().list(userId='me').execute()
+        # labels().list() never includes the counters, those still come from the
+        # batched labels().get() calls, but the names can be taken from here.
+        results = get_gmail_client().users().labels().list(userId='me', fields='labels(id,name)').execute()
 
         labels = results.get('labels', [])
+
+        for label in labels:
+            # A renamed label needs its gauges made again, the name is in their description.
+            if label['id'] in LABEL_SLOTS and LABEL_SLOTS[label['id']].name != label['name']:
+                remove_label_slot(label['id'])
+
+            LABEL_NAME_CACHE[label['id']] = label['name']
     else:
         logging.info('Using labels: %s ', args.labels)
 
@@ -118,128 +263,410 @@ def get_labels():
         logging.info('No labels found.')
         sys.exit()
 
+    # Labels that were deleted since the last refresh should stop being exported.
+    label_ids = {label['id'] for label in labels}
+
+    for label_id in [label_id for label_id in LABEL_SLOTS if label_id not in label_ids]:
+        remove_label_slot(label_id)
+
+    LABELS_CACHE['labels'] = labels
+    LABELS_CACHE['fetched'] = time()
+
     return labels
 
 gauge_collection = {}
+gauge_collection_lock = threading.Lock()
 
 def get_gauge_for_label(name, desc, labels = None):
     if labels is None:
         labels = []
 
-    if name not in gauge_collection:
-        gauge = Gauge('gmail_' + name, desc, labels)
-        gauge_collection[name] = gauge
+    # Creating a Gauge registers it, so doing that twice for the same name (eg, from
+    # two threads racing) raises "Duplicated timeseries". dict.setdefault() would not
+    # help as it would still construct the second Gauge, hence the lock.
+    with gauge_collection_lock:
+        if name not in gauge_collection:
+            gauge_collection[name] = Gauge('gmail_' + name, desc, labels)
+
+        return gauge_collection[name]
+
+@dataclass(slots=True)
+class LabelSlot:
+    """
+    The gauges for one label, looked up once so updates can set them directly.
+    """
+
+    id: str
+    name: str
+    g_total: Gauge
+    g_unread: Gauge
+    g_sender: Optional[Gauge]
+
+LABEL_SLOTS = dict()
+
+def get_label_slot(label_id, label_name):
+    if label_id not in LABEL_SLOTS:
+        g_sender = None
+
+        if label_id in args.labelsSenderCount:
+            g_sender = get_gauge_for_label(label_id + '_sender', 'Label sender info', ['sender'])
+
+        LABEL_SLOTS[label_id] = LabelSlot(
+            id = label_id,
+            name = label_name,
+            g_total = get_gauge_for_label(label_id + '_total', label_name + ' Total'),
+            g_unread = get_gauge_for_label(label_id + '_unread', label_name + ' Unread'),
+            g_sender = g_sender,
+        )
+
+    return LABEL_SLOTS[label_id]
+
+def remove_label_slot(label_id):
+    """
+    Unregisters the gauges of a label that is gone, so its last values are not
+    exported forever.
+    """
+
+    LABEL_SLOTS.pop(label_id, None)
+    LABEL_NAME_CACHE.pop(label_id, None)
+
+    with gauge_collection_lock:
+        for suffix in ['_total', '_unread', '_sender']:
+            gauge = gauge_collection.pop(label_id + suffix, None)
+
+            if gauge is not None:
+                REGISTRY.unregister(gauge)
+
+def chunks(items, size = BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def is_retryable_error(exception):
+    """
+    Rate limits, server errors and transport failures are worth retrying, other
+    HTTP errors (eg, 404 for a deleted label) will fail the same way again.
+    """
+
+    if isinstance(exception, HttpError):
+        return exception.resp.status == 429 or exception.resp.status >= 500
+
+    return True
+
+def on_label_info(failed, gone, request_id, label_info, exception):
+    """
+    Batch callback for users().labels().get(), request_id is the label id.
+    Labels that failed with a retryable error are added to failed, labels that
+    cannot be fetched at all are added to gone.
+    """
+
+    if exception is not None:
+        # eg, if this script is started with a label that exists, that is then deleted
+        # after startup, 404 exceptions are thrown.
+        #
+        # Occsionally, the gmail API will throw garbage, too. Hence the error is
+        # only logged, this keeps the rest of the batch going.
+        logging.error("Error for label %s: %s", request_id, exception)
+
+        if is_retryable_error(exception):
+            failed.append(request_id)
+        else:
+            gone.append(request_id)
+
+        return
+
+    try:
+        slot = LABEL_SLOTS.get(label_info['id'])
 
-    return gauge_collection[name]
+        if slot is None:
+            if 'name' in label_info:
+                LABEL_NAME_CACHE[label_info['id']] = label_info['name']
+
+            slot = get_label_slot(label_info['id'], LABEL_NAME_CACHE[label_info['id']])
+
+        slot.g_total.set(label_info['threadsTotal'])
+        slot.g_unread.set(label_info['threadsUnread'])
+
+    except Exception as e:
+        logging.error("Error: %s", e)
 
 def update_gauages_from_gmail(*unused_arguments_needed_for_scheduler):
+    global LAST_HISTORY_ID
+
     logging.info("Updating gmail metrics - started")
 
-    for label in get_labels():
-        try:
-            label_info = GMAIL_CLIENT.users().labels().get(id=label['id'], userId='me').execute()
+    # The mailbox historyId changes whenever anything in the mailbox does, if it
+    # is unchanged then so are all the counters and the gauges keep their values.
+    try:
+        history_id = get_gmail_client().users().getProfile(userId='me', fields='historyId').execute()['historyId']
+    except Exception as e:
+        logging.error("Error getting profile: %s", e)
+        history_id = None
+
+    if history_id is not None and history_id == LAST_HISTORY_ID:
+        logging.info("Updating gmail metrics - mailbox unchanged, skipped")
+        return True
 
-            gauge = get_gauge_for_label(label_info['id'] + '_total', label_info['name']  + ' Total')
-            gauge.set(label_info['threadsTotal'])
+    complete = True
+    failed_labels = []
+    gone_labels = []
 
-            gauge = get_gauge_for_label(label_info['id'] + '_unread', label_info['name'] + ' Unread')
-            gauge.set(label_info['threadsUnread'])
+    for label_chunk in chunks(get_labels()):
+        batch = get_gmail_client().new_batch_http_request(callback = partial(on_label_info, failed_labels, gone_labels))
 
-            if label['id'] in args.labelsSenderCount:
-                update_sender_gauges_for_label(label_info['id'])
+        for label in label_chunk:
+            if label['id'] in LABEL_SLOTS or label['id'] in LABEL_NAME_CACHE:
+                fields = 'id,threadsTotal,threadsUnread'
+            else:
+                fields = 'id,name,threadsTotal,threadsUnread'
 
+            batch.add(get_gmail_client().users().labels().get(id=label['id'], userId='me', fields=fields), request_id = label['id'])
+
+        try:
+            batch.execute()
         except Exception as e:
-            # eg, if this script is started with a label that exists, that is then deleted
-            # after startup, 404 exceptions are thrown.
-            #
-            # Occsionally, the gmail API will throw garbage, too. Hence the try/catch.
             logging.error("Error: %s", e)
+            complete = False
+
+    # Errors for single calls in a batch do not raise, they only reach the callback.
+    if failed_labels:
+        complete = False
+
+    # Labels that are gone are dropped until the next label refresh, so they do
+    # not keep every later update from counting as complete.
+    if gone_labels:
+        LABELS_CACHE['labels'] = [label for label in LABELS_CACHE['labels'] if label['id'] not in gone_labels]
+
+        for label_id in gone_labels:
+            remove_label_slot(label_id)
+
+    # Each label needs its own paged listing, so these run concurrently rather than one after the other.
+    sender_labels = [label['id'] for label in get_labels() if label['id'] in args.labelsSenderCount]
+
+    futures = {label: EXECUTOR.submit(update_sender_gauges_for_label, label) for label in sender_labels}
+
+    for label, future in futures.items():
+        try:
+            if not future.result():
+                complete = False
+        except Exception as e:
+            logging.error("Error updating senders for label %s: %s", label, e)
+            complete = False
+
+    # Only remember the historyId when everything was updated, otherwise the
+    # next update would skip retrying what failed.
+    if complete:
+        LAST_HISTORY_ID = history_id
 
     logging.info("Updating gmail metrics - complete")
 
+    return complete
+
 def get_first_message_sender(thread):
-    if thread is None or thread['messages'] is None:
+    if not thread or not thread.get('messages'):
         return "unknown-thread-no-messages"
 
     firstMessage = thread['messages'][0]
 
-    for header in firstMessage['payload']['headers']:
-        if header['name'] == 'From':
-            return header['value']
+    # Threads are fetched with metadataHeaders=From, so that is the only header.
+    headers = firstMessage.get('payload', {}).get('headers', [])
+
+    if headers:
+        return headers[0]['value']
 
     return "unknown-no-from"
 
 def get_all_threads_for_label(labelId):
     logging.info("get_all_threads_for_label - this method can be expensive: %s", str(labelId))
 
-    response = GMAIL_CLIENT.users().threads().list(userId = 'me', labelIds = [labelId], q = "is:unread").execute()
+    # 500 is the largest page size the API allows, fewer pages means fewer round trips.
+    request = get_gmail_client().users().threads().list(userId = 'me', labelIds = [labelId], q = args.senderQuery, maxResults = 500, fields = THREAD_LIST_FIELDS)
 
     threads = []
 
-    logging.info("get_all_threads_for_label - result size estimate: %s", str(response['resultSizeEstimate']))
+    while request is not None:
+        response = request.execute()
 
-    if "threads" in response:
-        threads.extend(response['threads'])
+        threads.extend(response.get('threads', []))
 
-    while "nextPageToken" in response:
-        page_token = response['nextPageToken']
-        response = GMAIL_CLIENT.users().threads().list(userId = 'me', labelIds = [labelId], pageToken = page_token, q = "is:unread").execute()
-        threads.extend(response['threads'])
+        request = get_gmail_client().users().threads().list_next(request, response)
 
-        logging.info("Getting more threads for label %s: %s", labelId, str(len(threads)))
+    logging.info("get_all_threads_for_label - got %d threads for label %s", len(threads), labelId)
 
     return threads
 
-def get_thread_messages(thread):
-    logging.info("Fetching thread messages for %s", str(thread['id']))
+def on_thread_metadata(senders, failed, request_id, thread, exception):
+    """
+    Batch callback for users().threads().get(), request_id is the thread id.
+    The sender is added to senders as well as to the cache, threads that failed
+    with a retryable error are added to failed.
+    """
 
-    res = GMAIL_CLIENT.users().threads().get(userId = 'me', id = thread['id'], format = "metadata").execute()
+    if exception is not None:
+        # A 404 here is a thread that was deleted after it was listed.
+        logging.error("Error fetching thread %s: %s", request_id, exception)
+
+        if is_retryable_error(exception):
+            failed.append(request_id)
+
+        return
+
+    # Many threads share the same few senders, interning keeps one copy of each.
+    sender = sys.intern(get_first_message_sender(thread))
+
+    senders[request_id] = sender
+
+    with THREAD_SENDER_LOCK:
+        THREAD_SENDER_CACHE[request_id] = sender
+
+def fetch_thread_senders(threads):
+    """
+    Returns the senders of threads by thread id, threads that failed to fetch
+    are left out, and whether there were no retryable failures.
+    """
 
-    thread['messages'] = res['messages']
+    senders = dict()
+    failed = []
 
-    return thread
+    for thread_chunk in chunks(threads):
+        logging.info("Fetching thread messages for %d threads", len(thread_chunk))
+
+        batch = get_gmail_client().new_batch_http_request(callback = partial(on_thread_metadata, senders, failed))
+
+        for thread in thread_chunk:
+            batch.add(get_gmail_client().users().threads().get(userId = 'me', id = thread['id'], format = "metadata", metadataHeaders = ['From']), request_id = thread['id'])
+
+        batch.execute()
+
+    return senders, not failed
 
 def update_sender_gauges_for_label(label):
-    global THREAD_SENDER_CACHE
+    """
+    Returns False when a retryable failure left some senders unknown.
+    """
+
+    slot = LABEL_SLOTS.get(label)
+
+    # The slot is created once the label counters have been fetched, until then
+    # there is nothing to update. If that fetch failed in a way worth retrying
+    # the update is already incomplete.
+    if slot is None or slot.g_sender is None:
+        return True
 
-    senderCounts = dict()
+    threads = get_all_threads_for_label(label)
 
-    for thread in get_all_threads_for_label(label):
-        if thread['id'] not in THREAD_SENDER_CACHE:
-            thread = get_thread_messages(thread)
+    # The senders are taken from the cache only once, entries can expire or be
+    # evicted while the misses are being fetched.
+    senders = dict()
+    misses = []
 
-            THREAD_SENDER_CACHE[thread['id']] = get_first_message_sender(thread)
+    with THREAD_SENDER_LOCK:
+        for thread in threads:
+            sender = THREAD_SENDER_CACHE.get(thread['id'])
 
-        sender = THREAD_SENDER_CACHE[thread['id']]
+            if sender is None:
+                misses.append(thread)
+            else:
+                senders[thread['id']] = sender
 
-        if sender not in senderCounts:
-            senderCounts[sender] = 0
+    # Threads that failed to fetch are left out, they are retried on the next
+    # update, which is not skipped as this returns False.
+    fetched, complete = fetch_thread_senders(misses)
+    senders.update(fetched)
 
-        senderCounts[sender] += 1
+    senderCounts = Counter(senders.values())
 
     for sender, messageCount in senderCounts.items():
-        g = get_gauge_for_label(label + '_sender', 'Label sender info', ['sender'])
-        g.labels(sender=sender).set(messageCount)
+        slot.g_sender.labels(sender=sender).set(messageCount)
+
+    return complete
+
+def get_sender_cache_size():
+    with THREAD_SENDER_LOCK:
+        return len(THREAD_SENDER_CACHE)
 
 def get_gmail_client():
-    return discovery.build('gmail', 'v1', credentials = get_credentials())
+    if not hasattr(THREAD_LOCAL, 'gmail_client'):
+        # The same transport discovery.build(credentials=...) would create, built
+        # here only so each thread's client gets its own. build_http() sets a
+        # socket timeout, without one a stalled connection would block the
+        # update worker forever.
+        http_client = AuthorizedHttp(CREDENTIALS, http = build_http())
+
+        # static_discovery uses the discovery document that ships with
+        # google-api-python-client, so building a client never needs the network.
+        THREAD_LOCAL.gmail_client = discovery.build('gmail', 'v1', http = http_client, static_discovery = True)
+
+    return THREAD_LOCAL.gmail_client
+
+class GmailCollector(Collector):
+    """
+    Asks the update worker for fresh metrics when Prometheus scrapes and the
+    last update is older than updateDelaySeconds, so that nothing is fetched
+    from gmail while nobody is scraping. The scrape itself never waits for
+    gmail, it gets the values from the last update.
+    """
+
+    def describe(self):
+        return [self.get_last_update_metric()]
+
+    def collect(self):
+        if time() - LAST_UPDATE['time'] > args.updateDelaySeconds:
+            UPDATE_REQUESTED.set()
+
+        return [self.get_last_update_metric()]
+
+    def get_last_update_metric(self):
+        return GaugeMetricFamily('gmail_last_update_timestamp_seconds', 'When the gmail metrics were last updated', value = LAST_UPDATE['time'])
+
+def update_worker():
+    backoff_seconds = 0
 
-def infinate_update_loop():
     while True:
-        update_gauages_from_gmail()
-        sleep(args.updateDelaySeconds)
+        UPDATE_REQUESTED.wait()
+        UPDATE_REQUESTED.clear()
+
+        try:
+            complete = update_gauages_from_gmail()
+        except Exception as e:
+            logging.error("Error: %s", e)
+            complete = False
+
+        if complete:
+            LAST_UPDATE['time'] = time()
+            READY_GAUGE.set(1)
+            backoff_seconds = 0
+        else:
+            backoff_seconds = min(max(backoff_seconds * 2, MIN_BACKOFF_SECONDS), MAX_BACKOFF_SECONDS)
+
+            logging.warning("Update incomplete, waiting %d seconds before the next one", backoff_seconds)
+            sleep(backoff_seconds)
 
 def main():
     logging.getLogger().setLevel(args.logLevel)
 
-    global GMAIL_CLIENT
-    GMAIL_CLIENT = get_gmail_client()
+    use_orjson_for_responses()
+
+    global CREDENTIALS
+    CREDENTIALS = get_credentials()
+
+    global EXECUTOR
+    EXECUTOR = ThreadPoolExecutor(max_workers = args.maxConcurrency)
+
+    global THREAD_SENDER_CACHE
+    THREAD_SENDER_CACHE = TTLCache(maxsize = args.senderCacheSize, ttl = args.senderCacheSeconds)
+
+    gauge = Gauge('gmail_sender_cache_size', 'Number of threads in the sender cache')
+    gauge.set_function(get_sender_cache_size)
+
+    REGISTRY.register(GmailCollector())
 
     logging.info("prometheus-gmail-exporter started on port %d", args.promPort)
     start_http_server(args.promPort)
 
     if args.daemonize:
-        infinate_update_loop()
+        # Have the first metrics ready before the first scrape.
+        UPDATE_REQUESTED.set()
+        update_worker()
     else:
         update_gauages_from_gmail()
 
@@ -254,12 +681,17 @@ if __name__ == '__main__':
 
     parser.add_argument('--labels', nargs='*', default=[])
     parser.add_argument("--labelsSenderCount", nargs='*', default=[])
+    parser.add_argument("--senderQuery", type=str, default="is:unread")
+    parser.add_argument("--senderCacheSize", type=int, default=50000)
+    parser.add_argument("--senderCacheSeconds", type=int, default=6 * 3600)
     parser.add_argument('--clientSecretFile', default=get_homedir_filepath('client_secret.json'))
     parser.add_argument('--credentialsPath', default=get_homedir_filepath('login_cookie.dat'))
     parser.add_argument("--updateDelaySeconds", type=int, default=300)
+    parser.add_argument("--labelsRefreshSeconds", type=int, default=3600)
     parser.add_argument("--oauthHost", type=str, default="example.com")
     parser.add_argument("--promPort", type=int, default=8080)
     parser.add_argument("--daemonize", action='store_true')
+    parser.add_argument("--maxConcurrency", type=int, default=10)
     parser.add_argument("--logLevel", type=int, default = 20)
     args = parser.parse_args()
 